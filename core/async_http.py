@@ -0,0 +1,45 @@
+"""
+Smart Alpha Dashboard — Async HTTP helpers
+Thin aiohttp wrappers for fan-out fetch pipelines where every call is
+independent I/O and wall time should collapse to the slowest request.
+"""
+
+import asyncio
+import aiohttp
+
+
+def make_session(total_timeout=20, connect_timeout=5):
+    """ClientSession tuned for many small API calls (pooled, DNS cached)."""
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout),
+        connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+    )
+
+
+async def async_jget(session, url, params=None, headers=None, retries=3):
+    """GET JSON with the same retry/backoff shape as HttpClient.jget."""
+    last_err = None
+    for i in range(retries):
+        try:
+            async with session.get(url, params=params, headers=headers) as r:
+                if r.status in (429, 418, 520, 525):
+                    await asyncio.sleep(2 ** i)
+                    continue
+                r.raise_for_status()
+                return await r.json(content_type=None)
+        except Exception as e:
+            last_err = e
+            await asyncio.sleep(0.5 * (i + 1))
+    raise last_err or RuntimeError("async HTTP GET failed")
+
+
+async def async_map(coros, concurrency=16):
+    """Run coroutines with bounded concurrency; exceptions come back as
+    values (return_exceptions) so one bad token doesn't sink the batch."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro):
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*[bounded(c) for c in coros], return_exceptions=True)
@@ -3,43 +3,99 @@ Smart Alpha Dashboard — Data Sources
 Hybrid fetcher for Binance Alpha tokens and CoinGecko market data.
 """
 
-import requests
+import asyncio
+import json
+import re
+from pathlib import Path
+
+import aiohttp
 import pandas as pd
 import streamlit as st
 import traceback
 import time
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from core import async_http
+from core.utils import http, ttl_cache
+
+# --- Binance mirrors (global) ---
+BINANCE_TICKER_MIRRORS = [
+    "https://api-gcp.binance.com/api/v3/ticker/24hr",
+    "https://data.binance.com/api/v3/ticker/24hr",
+    "https://api1.binance.com/api/v3/ticker/24hr",
+    "https://api2.binance.com/api/v3/ticker/24hr",
+    "https://api3.binance.com/api/v3/ticker/24hr",
+]
+
+
+# Ticker columns that arrive as strings from Binance.
+NUMERIC_COLS = (
+    "lastPrice", "priceChangePercent", "priceChange", "volume", "quoteVolume",
+    "openPrice", "highPrice", "lowPrice", "weightedAvgPrice",
+)
+
+
+def _cast_ticker_numeric(df):
+    """Cast string ticker columns to compact floats in one C-level pass."""
+    present = [c for c in NUMERIC_COLS if c in df.columns]
+    if present:
+        df[present] = df[present].apply(pd.to_numeric, errors="coerce", downcast="float")
+    if "symbol" in df.columns:
+        df["symbol"] = df["symbol"].astype("category")
+    return df
+
+
+async def _probe_mirror(session, url):
+    """Fetch one mirror; return (url, payload) or raise."""
+    async with session.get(url) as r:
+        r.raise_for_status()
+        data = await r.json()
+        if not isinstance(data, list) or not data:
+            raise ValueError(f"unexpected payload from {url}")
+        return url, data
+
+
+async def _race_mirrors(urls):
+    """Probe all mirrors concurrently; first good answer wins, rest cancelled."""
+    timeout = aiohttp.ClientTimeout(total=10, connect=2)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        tasks = [asyncio.create_task(_probe_mirror(session, u)) for u in urls]
+        try:
+            last_err = None
+            for fut in asyncio.as_completed(tasks):
+                try:
+                    return await fut
+                except Exception as e:
+                    last_err = e
+            raise last_err or RuntimeError("all Binance mirrors failed")
+        finally:
+            for t in tasks:
+                t.cancel()
 
 
 # --------------------------------------------------------------------
 # 1️⃣  Binance → CoinGecko hybrid ticker fetcher
 # --------------------------------------------------------------------
+@st.cache_data(ttl=30, show_spinner=False)
 def get_ticker_24h_all():
     """
     Try Binance first (for Alpha pairs), then fall back to CoinGecko.
+    Mirrors are raced in parallel so a hanging mirror costs nothing —
+    worst case is one timeout, not one timeout per mirror.
     Returns a pandas DataFrame with normalized columns:
         symbol, lastPrice, quoteVolume, source
     """
-    # --- Binance mirrors (global) ---
-    mirrors = [
-        "https://api-gcp.binance.com/api/v3/ticker/24hr",
-        "https://data.binance.com/api/v3/ticker/24hr",
-        "https://api1.binance.com/api/v3/ticker/24hr",
-        "https://api2.binance.com/api/v3/ticker/24hr",
-        "https://api3.binance.com/api/v3/ticker/24hr",
-    ]
-
-    for url in mirrors:
-        try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            if isinstance(data, list) and len(data) > 0:
-                df = pd.DataFrame(data)
-                df["source"] = "binance"
-                st.info(f"✅ Loaded {len(df)} tickers from {url}")
-                return df
-        except Exception as e:
-            st.warning(f"Mirror failed: {url} → {e}")
+    try:
+        url, data = asyncio.run(_race_mirrors(BINANCE_TICKER_MIRRORS))
+        df = _cast_ticker_numeric(pd.DataFrame(data))
+        df["source"] = "binance"
+        st.info(f"✅ Loaded {len(df)} tickers from {url}")
+        return df
+    except Exception as e:
+        st.warning(f"⚠️ All Binance mirrors failed → {e}")
 
     # --- Fallback: CoinGecko global market data ---
     st.warning("⚠️ Binance unreachable — using CoinGecko data instead.")
@@ -54,7 +110,7 @@ def get_ticker_24h_all():
                 "page": page,
                 "sparkline": False,
             }
-            r = requests.get(cg_url, params=params, timeout=20)
+            r = http.session.get(cg_url, params=params, timeout=20)
             r.raise_for_status()
             chunk = r.json()
             if not chunk:
@@ -71,6 +127,7 @@ def get_ticker_24h_all():
             },
             inplace=True,
         )
+        df = _cast_ticker_numeric(df)
         df["source"] = "coingecko"
         st.success(f"✅ Loaded {len(df)} tickers from CoinGecko")
         return df
@@ -80,9 +137,81 @@ def get_ticker_24h_all():
         return pd.DataFrame()
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def get_klines(symbol, interval="1h", limit=60):
+    """Fetch spot klines for one symbol (raw Binance list-of-lists)."""
+    return http.jget(
+        "https://api.binance.com/api/v3/klines",
+        params={"symbol": symbol, "interval": interval, "limit": limit},
+        timeout=10,
+    )
+
+
+async def _klines_all_async(specs, concurrency=16):
+    """Fetch many kline windows on one event loop. `specs` are
+    (symbol, interval, limit) tuples; results come back in spec order,
+    with exceptions as values so one bad symbol doesn't sink the batch."""
+    async with async_http.make_session(total_timeout=10, connect_timeout=2) as session:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(symbol, interval, limit):
+            async with sem:
+                return await async_http.async_jget(
+                    session,
+                    "https://api.binance.com/api/v3/klines",
+                    params={"symbol": symbol, "interval": interval, "limit": int(limit)},
+                )
+
+        return await asyncio.gather(*[one(*s) for s in specs], return_exceptions=True)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_klines_batch(specs):
+    """Sync entry point: fetch every kline window concurrently and
+    return {(symbol, interval): klines}. Cached like get_klines so
+    widget-only reruns inside a refresh window don't refetch the whole
+    batch. Entries the event loop couldn't serve fall back to the
+    cached per-symbol get_klines; anything that still fails maps to
+    None."""
+    try:
+        results = asyncio.run(_klines_all_async(specs))
+    except Exception:
+        results = [None] * len(specs)
+    out = {}
+    for (symbol, interval, limit), r in zip(specs, results):
+        if r is None or isinstance(r, Exception):
+            try:
+                r = get_klines(symbol, interval, limit)
+            except Exception:
+                r = None
+        out[(symbol, interval)] = r
+    return out
+
+
 # --------------------------------------------------------------------
 # 2️⃣  Alpha mapping (mock or real)
 # --------------------------------------------------------------------
+@ttl_cache(3600)
+def get_exchange_info():
+    """Fetch Binance spot exchangeInfo (symbol metadata)."""
+    return http.jget("https://api.binance.com/api/v3/exchangeInfo", timeout=20)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_usdt_spot_symbols():
+    """Return the set of actively trading USDT spot symbols."""
+    try:
+        info = get_exchange_info()
+        return frozenset(
+            s["symbol"]
+            for s in info.get("symbols", [])
+            if s.get("quoteAsset") == "USDT" and s.get("status") == "TRADING"
+        )
+    except Exception:
+        return frozenset()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
 def map_alpha_to_binance():
     """
     Fetch Binance Alpha list. Replace this stub with real Alpha endpoint
@@ -91,16 +220,22 @@ def map_alpha_to_binance():
     """
     try:
         url = "https://data.binance.com/bapi/asset/v2/public/asset-service/product/get-alpha-list"
-        r = requests.get(url, timeout=10)
+        r = http.session.get(url, timeout=10)
         r.raise_for_status()
         data = r.json().get("data", [])
-        df = pd.DataFrame(data)
+        alpha = pd.DataFrame(data)
         # Normalize key columns
-        if "symbol" in df.columns:
-            df.rename(columns={"symbol": "base"}, inplace=True)
-        df["spot_symbol"] = df["base"].astype(str) + "USDT"
-        st.info(f"✅ Loaded {len(df)} Alpha tokens from Binance Alpha endpoint")
-        return df
+        if "base" in alpha.columns and "symbol" not in alpha.columns:
+            alpha.rename(columns={"base": "symbol"}, inplace=True)
+        alpha = alpha[alpha["symbol"].astype(bool)]
+        alpha["spot_symbol"] = alpha["symbol"].astype(str) + "USDT"
+        # Vectorized filter against live USDT spot pairs — one hashed
+        # isin pass instead of a per-row Python loop.
+        syms = get_usdt_spot_symbols()
+        if syms:
+            alpha = alpha[alpha["spot_symbol"].isin(syms)]
+        st.info(f"✅ Loaded {len(alpha)} Alpha tokens from Binance Alpha endpoint")
+        return alpha.reset_index(drop=True)
     except Exception as e:
         st.warning(f"⚠️ Could not load Alpha list, using fallback: {e}")
         # fallback static sample
@@ -116,26 +251,104 @@ def map_alpha_to_binance():
 # --------------------------------------------------------------------
 # 3️⃣  CoinGecko fundamentals / market data (reused by scoring)
 # --------------------------------------------------------------------
+@ttl_cache(3600)
+def cg_coin_list_with_platforms():
+    """Fetch the full CoinGecko coin list (with contract platforms)."""
+    url = "https://api.coingecko.com/api/v3/coins/list"
+    return http.jget(url, params={"include_platform": "true"}, timeout=30)
+
+
+@lru_cache(maxsize=1)
+def _cg_symbol_index():
+    """Build symbol_lower -> [(id, platforms), ...] once per process."""
+    idx = defaultdict(list)
+    for c in cg_coin_list_with_platforms():
+        idx[c["symbol"].lower()].append((c["id"], c.get("platforms") or {}))
+    return idx
+
+
+# Resolved symbol->id pairs are essentially static; persist them so a
+# cold start skips the coins/list download for known symbols.
+_CG_ID_CACHE_PATH = Path.home() / ".smart_alpha_cg_ids.json"
+
+
+def _load_cg_id_cache():
+    try:
+        return json.loads(_CG_ID_CACHE_PATH.read_text())
+    except Exception:
+        return {}
+
+
+_CG_ID_DISK = _load_cg_id_cache()
+
+
+def _save_cg_id_cache():
+    try:
+        _CG_ID_CACHE_PATH.write_text(json.dumps(_CG_ID_DISK))
+    except Exception:
+        pass
+
+
+@lru_cache(maxsize=4096)
 def cg_find_id_by_symbol_platform(symbol: str, platform=None):
-    """Find CoinGecko ID from symbol (best-effort)."""
+    """Find CoinGecko ID from symbol (best-effort), via the cached index."""
+    key = f"{symbol.lower()}|{platform or ''}"
+    cached = _CG_ID_DISK.get(key)
+    if cached:
+        return cached
     try:
-        url = "https://api.coingecko.com/api/v3/coins/list"
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        data = pd.DataFrame(r.json())
-        hit = data[data["symbol"].str.lower() == symbol.lower()]
-        if not hit.empty:
-            return hit.iloc[0]["id"]
+        for cid, plats in _cg_symbol_index().get(symbol.lower(), []):
+            if platform is None or platform in plats:
+                _CG_ID_DISK[key] = cid
+                _save_cg_id_cache()
+                return cid
     except Exception:
         pass
     return None
 
 
+def cg_markets_batch(coin_ids):
+    """
+    Fetch market data (price, mcap, FDV, supplies) for many coins at
+    once via /coins/markets — one request per 250 IDs instead of one
+    per coin. Returns a DataFrame indexed like the API response.
+    """
+    frames = []
+    ids = [c for c in coin_ids if c]
+    for i in range(0, len(ids), 250):
+        chunk = ids[i:i + 250]
+        try:
+            data = http.jget(
+                "https://api.coingecko.com/api/v3/coins/markets",
+                params={
+                    "vs_currency": "usd",
+                    "ids": ",".join(chunk),
+                    "per_page": 250,
+                    "page": 1,
+                    "sparkline": "false",
+                    "price_change_percentage": "1h,24h,7d",
+                },
+            )
+            if data:
+                frames.append(pd.DataFrame(data))
+        except Exception:
+            continue
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+# CoinGecko free tier allows ~30-50 req/min; bound concurrent hits.
+_CG_SEM = threading.Semaphore(5)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
 def cg_coin_market_data(cg_id: str):
     """Fetch full coin data from CoinGecko."""
     try:
         url = f"https://api.coingecko.com/api/v3/coins/{cg_id}"
-        r = requests.get(url, timeout=20)
+        with _CG_SEM:
+            r = http.session.get(url, timeout=20)
         r.raise_for_status()
         return r.json()
     except Exception:
@@ -145,11 +358,12 @@ def cg_coin_market_data(cg_id: str):
 # --------------------------------------------------------------------
 # 4️⃣  Token unlocks lookup (optional external API)
 # --------------------------------------------------------------------
+@st.cache_data(ttl=1800, show_spinner=False)
 def unlocks_lookup(symbol: str):
     """Fetch unlock schedule from TokenUnlocks API."""
     try:
         url = f"https://token.unlocks.app/api/token/{symbol.lower()}"
-        r = requests.get(url, timeout=10)
+        r = http.session.get(url, timeout=10)
         if r.status_code == 200:
             return r.json()
     except Exception:
@@ -165,7 +379,9 @@ def parse_next_unlock(data):
         events = data.get("events") or []
         if not events:
             return {}
-        nxt = sorted(events, key=lambda x: x.get("date"))[0]
+        # min() is O(N) with no list copy, vs sorting just to take [0];
+        # coalesce None dates so they sort last instead of crashing.
+        nxt = min(events, key=lambda x: x.get("date") or "9999")
         return {
             "next_date": nxt.get("date"),
             "next_pct": nxt.get("percent"),
@@ -176,23 +392,150 @@ def parse_next_unlock(data):
 
 
 # --------------------------------------------------------------------
-# 5️⃣  GitHub repo stats (for developer activity)
+# 5️⃣  DefiLlama TVL + GitHub repo stats (for usage/dev activity)
 # --------------------------------------------------------------------
+def llama_protocol_tvl(slug):
+    """Fetch current TVL (USD) for a protocol from DefiLlama."""
+    if not slug:
+        return None
+    try:
+        url = f"https://api.llama.fi/tvl/{slug}"
+        r = http.session.get(url, timeout=10)
+        if r.status_code == 200:
+            return float(r.text)
+    except Exception:
+        pass
+    return None
+
+
+# Compiled once at import; per-call work is just the match.
+_GH_RE = re.compile(r"https?://github\.com/([^/]+)/([^/]+)")
+
+
+def _gh_api_url(url):
+    """Turn a GitHub repo URL into its commit_activity API URL, or None."""
+    m = _GH_RE.match((url or "").strip())
+    if not m:
+        return None
+    return f"https://api.github.com/repos/{m.group(1)}/{m.group(2)}/stats/commit_activity"
+
+
+def _parse_commit_activity(weeks):
+    """Reduce a commit_activity payload to approximate 30d stats."""
+    if not isinstance(weeks, list):
+        # 202: stats still generating; skip
+        return {}
+    commits_30d = sum(w.get("total", 0) for w in weeks[-4:])
+    contribs = len(
+        set(c["author"]["login"] for w in weeks[-4:] for c in w.get("days", []) if c)
+    )
+    return {"github_commits_approx": commits_30d, "github_contributors": contribs}
+
+
+@st.cache_data(ttl=900, show_spinner=False)
 def github_repo_stats(url):
     """Fetch public GitHub commit stats (approx)."""
     try:
-        parts = url.rstrip("/").split("/")
-        user, repo = parts[-2], parts[-1]
-        api_url = f"https://api.github.com/repos/{user}/{repo}/stats/commit_activity"
-        r = requests.get(api_url, timeout=10)
-        if r.status_code == 202:
-            # stats generating; skip
+        api_url = _gh_api_url(url)
+        if not api_url:
             return {}
-        weeks = r.json()
-        commits_30d = sum(w.get("total", 0) for w in weeks[-4:])
-        contribs = len(
-            set(c["author"]["login"] for w in weeks[-4:] for c in w.get("days", []) if c)
-        )
-        return {"github_commits_approx": commits_30d, "github_contributors": contribs}
+        return _parse_commit_activity(http.jget_conditional(api_url, timeout=10))
     except Exception:
         return {}
+
+
+# --------------------------------------------------------------------
+# 6️⃣  Parallel per-token enrichment
+# --------------------------------------------------------------------
+def enrich_token(symbol, cg_id=None, repo_url=None, slug=None):
+    """
+    Fetch CoinGecko, unlock, TVL, and GitHub data for one token in
+    parallel. The four endpoints are independent, so the wall time is
+    the slowest call instead of the sum of all four.
+    """
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_cg = ex.submit(cg_coin_market_data, cg_id) if cg_id else None
+        f_un = ex.submit(unlocks_lookup, symbol)
+        f_tvl = ex.submit(llama_protocol_tvl, slug)
+        f_gh = ex.submit(github_repo_stats, repo_url) if repo_url else None
+        return {
+            "cg": f_cg.result() if f_cg else {},
+            "unlock": f_un.result(),
+            "tvl": f_tvl.result(),
+            "gh": f_gh.result() if f_gh else {},
+        }
+
+
+def enrich_tokens(tokens, max_workers=16):
+    """
+    Batch-enrich many tokens concurrently. `tokens` is a list of dicts
+    with keys matching enrich_token's signature; returns {symbol: result}.
+    """
+    out = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futs = {ex.submit(enrich_token, **t): t["symbol"] for t in tokens}
+        for f, sym in futs.items():
+            try:
+                out[sym] = f.result()
+            except Exception:
+                out[sym] = {}
+    return out
+
+
+async def _enrich_one_async(session, cg_sem, symbol, cg_id=None, repo_url=None, slug=None):
+    """Async twin of enrich_token: all four endpoints in flight at once."""
+
+    async def cg():
+        if not cg_id:
+            return {}
+        async with cg_sem:
+            return await async_http.async_jget(
+                session, f"https://api.coingecko.com/api/v3/coins/{cg_id}"
+            )
+
+    async def unlock():
+        return await async_http.async_jget(
+            session, f"https://token.unlocks.app/api/token/{symbol.lower()}"
+        )
+
+    async def tvl():
+        if not slug:
+            return None
+        val = await async_http.async_jget(session, f"https://api.llama.fi/tvl/{slug}")
+        return float(val)
+
+    async def gh():
+        api_url = _gh_api_url(repo_url)
+        if not api_url:
+            return {}
+        return _parse_commit_activity(await async_http.async_jget(session, api_url))
+
+    r_cg, r_un, r_tvl, r_gh = await asyncio.gather(
+        cg(), unlock(), tvl(), gh(), return_exceptions=True
+    )
+    fb = lambda v, d: d if isinstance(v, BaseException) else v
+    return {
+        "cg": fb(r_cg, {}),
+        "unlock": fb(r_un, {}),
+        "tvl": fb(r_tvl, None),
+        "gh": fb(r_gh, {}),
+    }
+
+
+async def enrich_all_async(tokens, cg_concurrency=10):
+    """Enrich a whole watchlist on one event loop; returns {symbol: result}."""
+    async with async_http.make_session() as session:
+        cg_sem = asyncio.Semaphore(cg_concurrency)
+        results = await asyncio.gather(
+            *[_enrich_one_async(session, cg_sem, **t) for t in tokens]
+        )
+        return {t["symbol"]: r for t, r in zip(tokens, results)}
+
+
+def enrich_tokens_async(tokens):
+    """Sync entry point for enrich_all_async; falls back to the thread
+    pool if no event loop can be started here."""
+    try:
+        return asyncio.run(enrich_all_async(tokens))
+    except Exception:
+        return enrich_tokens(tokens)
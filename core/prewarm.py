@@ -0,0 +1,55 @@
+"""
+Smart Alpha Dashboard — Cache prewarming
+Fetches the heavyweight catalogues in the background so the first page
+render doesn't pay for them on the critical path, and keeps them warm
+ahead of their TTLs.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import data_sources as ds
+
+# Only the plain ttl_cache-backed fetchers are prewarmed here: the
+# st.cache_data builders need a Streamlit script context and warm up on
+# the first real render instead.
+_PREWARM_TARGETS = (ds.get_exchange_info, ds.cg_coin_list_with_platforms)
+
+_started = False
+_lock = threading.Lock()
+
+
+def _prewarm():
+    with ThreadPoolExecutor(max_workers=len(_PREWARM_TARGETS)) as ex:
+        for fn in _PREWARM_TARGETS:
+            ex.submit(fn)
+
+
+def _refresh_loop(interval_s):
+    while True:
+        time.sleep(interval_s)
+        try:
+            # Expire the warm entries first: without this the refresh
+            # call is a ttl_cache hit that fetches nothing and the
+            # catalogue still goes cold at its original TTL.
+            for fn in _PREWARM_TARGETS:
+                clear = getattr(fn, "cache_clear", None)
+                if clear is not None:
+                    clear()
+            _prewarm()
+        except Exception:
+            pass
+
+
+def start_prewarm(refresh_s=3000):
+    """Kick off the background warmers once per process; safe to call on
+    every Streamlit rerun. refresh_s sits just under the 1h catalogue
+    TTL so refreshes land before expiry."""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_prewarm, daemon=True).start()
+    threading.Thread(target=_refresh_loop, args=(refresh_s,), daemon=True).start()
@@ -1,5 +1,14 @@
 from typing import Dict, Any
 import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba optional: kernels just run interpreted
+    def njit(*args, **kwargs):
+        def deco(fn):
+            return fn
+        return deco
 
 def nz(x, d=0.0):
     try:
@@ -7,33 +16,42 @@ def nz(x, d=0.0):
     except Exception:
         return d
 
-def momentum_score(chg_15m, chg_1h, chg_4h, chg_24h, vol_accel):
-    # clip extreme tails & weight
+# Scalar kernels are pure float math, so numba (when installed) compiles
+# them to native code for hot per-row callers. The public functions stay
+# thin wrappers that handle None/str coercion, which numba can't.
+
+@njit(cache=True, fastmath=True)
+def _momentum_kernel(chg15, chg1h, chg4h, chg24h, va):
     s = 0.0
-    s += max(min(nz(chg_15m), 50), -25) * 0.20
-    s += max(min(nz(chg_1h), 50), -25) * 0.35
-    s += max(min(nz(chg_4h), 60), -30) * 0.20
-    s += max(min(nz(chg_24h), 80), -40) * 0.10
-    s += (max(min(nz(vol_accel), 8), 0) - 1) * 12
+    s += max(min(chg15, 50.0), -25.0) * 0.20
+    s += max(min(chg1h, 50.0), -25.0) * 0.35
+    s += max(min(chg4h, 60.0), -30.0) * 0.20
+    s += max(min(chg24h, 80.0), -40.0) * 0.10
+    s += (max(min(va, 8.0), 0.0) - 1.0) * 12.0
     return s
 
-def fundamental_score(mcap_usd, fdv_usd, circ_ratio):
+@njit(cache=True, fastmath=True)
+def _fundamental_kernel(mc, fdv, cr):
     s = 0.0
-    mc = nz(mcap_usd, 0)
-    fdv = nz(fdv_usd, 0)
-    cr = nz(circ_ratio, 0)
-    if mc>0:
-        s += max(0, 12 - math.log10(mc))  # smaller caps get small bonus
-    if fdv>0 and mc>0:
-        dil = fdv/mc
+    if mc > 0:
+        s += max(0.0, 12.0 - math.log10(mc))  # smaller caps get small bonus
+    if fdv > 0 and mc > 0:
+        dil = fdv / mc
         if dil < 1.3: s += 2.0
         elif dil < 2.0: s += 0.5
         else: s -= 1.0
-    if cr>0:
+    if cr > 0:
         if cr >= 0.6: s += 1.5
         elif cr <= 0.2: s -= 1.0
     return s
 
+def momentum_score(chg_15m, chg_1h, chg_4h, chg_24h, vol_accel):
+    # clip extreme tails & weight
+    return _momentum_kernel(nz(chg_15m), nz(chg_1h), nz(chg_4h), nz(chg_24h), nz(vol_accel))
+
+def fundamental_score(mcap_usd, fdv_usd, circ_ratio):
+    return _fundamental_kernel(nz(mcap_usd, 0), nz(fdv_usd, 0), nz(circ_ratio, 0))
+
 def unlock_risk_score(days_to_unlock, pct_unlock):
     # negative weight if a big unlock is imminent
     d = nz(days_to_unlock, 999)
@@ -58,6 +76,61 @@ def usage_dev_score(active_users=None, tvl_change_7d=None, commits_30d=None, con
         if contributors >= 5: s += 1.0
     return s
 
+# ---- vectorized variants: same formulas, whole columns at once ----
+
+def _arr(df, col, default=0.0):
+    if col not in df.columns:
+        return np.full(len(df), default)
+    a = df[col].astype("float64").to_numpy()
+    return np.where(np.isnan(a), default, a)
+
+def momentum_score_vec(df):
+    s = np.clip(_arr(df, "chg_15m_pct"), -25, 50) * 0.20
+    s += np.clip(_arr(df, "chg_1h_pct"), -25, 50) * 0.35
+    s += np.clip(_arr(df, "chg_4h_pct"), -30, 60) * 0.20
+    s += np.clip(_arr(df, "chg_24h_pct"), -40, 80) * 0.10
+    s += (np.clip(_arr(df, "vol_accel_1h_vs_6h"), 0, 8) - 1) * 12
+    return s
+
+def fundamental_score_vec(df):
+    mc = _arr(df, "market_cap_usd")
+    fdv = _arr(df, "fdv_usd")
+    cr = _arr(df, "circ_ratio")
+    s = np.where(mc > 0, np.maximum(0, 12 - np.log10(np.maximum(mc, 1.0))), 0.0)
+    dil = fdv / np.maximum(mc, 1.0)
+    s += np.where((fdv > 0) & (mc > 0),
+                  np.where(dil < 1.3, 2.0, np.where(dil < 2.0, 0.5, -1.0)), 0.0)
+    s += np.where(cr >= 0.6, 1.5, np.where((cr > 0) & (cr <= 0.2), -1.0, 0.0))
+    return s
+
+def unlock_risk_score_vec(df):
+    d = _arr(df, "next_unlock_days", 999.0)
+    p = _arr(df, "next_unlock_pct")
+    s = np.where((d <= 3) & (p >= 1), -5.0,
+                 np.where((d <= 7) & (p >= 1), -3.0,
+                          np.where((d <= 14) & (p >= 1), -1.5, 0.0)))
+    s += np.where(p >= 5, -3.0, 0.0)
+    s += np.where(p >= 10, -5.0, 0.0)
+    return s
+
+def usage_dev_score_vec(df):
+    # NaN compares False everywhere, matching the scalar None checks
+    tvl = _arr(df, "tvl_change_7d_pct", np.nan)
+    c = _arr(df, "github_commits_30d", np.nan)
+    n = _arr(df, "github_contributors", np.nan)
+    s = np.where(tvl > 10, 2.0, np.where(tvl < -10, -1.0, 0.0))
+    s += np.where(c > 50, 2.0, np.where(c > 10, 1.0, 0.0))
+    s += np.where(n >= 5, 1.0, 0.0)
+    return s
+
+def smart_alpha_score_vec(df):
+    w = dict(momentum=0.35, fundamentals=0.25, unlock=0.20, usage=0.20)
+    total = (momentum_score_vec(df)*w["momentum"] +
+             fundamental_score_vec(df)*w["fundamentals"] +
+             unlock_risk_score_vec(df)*w["unlock"] +
+             usage_dev_score_vec(df)*w["usage"])
+    return np.clip(total + 50, 0.0, 100.0)
+
 def smart_alpha_score(components: Dict[str, Any]):
     w = dict(momentum=0.35, fundamentals=0.25, unlock=0.20, usage=0.20)
     total = (components.get("momentum",0)*w["momentum"] +
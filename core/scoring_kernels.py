@@ -0,0 +1,47 @@
+"""
+Smart Alpha Dashboard — JIT kline feature kernels
+Tight numeric routines over float64 kline arrays. With numba installed
+they compile to native code via njit; without it they run interpreted
+and return the same values. No fastmath here: NaN is a meaningful
+"no data" sentinel and fastmath makes NaN handling undefined.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba optional: kernels just run interpreted
+    def njit(*args, **kwargs):
+        def deco(fn):
+            return fn
+        return deco
+
+
+@njit(cache=True)
+def _pct_change(closes, n):
+    """Percent change over the last n candles; NaN when unavailable."""
+    if closes.size < 2:
+        return np.nan
+    a = closes[-n] if closes.size >= n else closes[0]
+    b = closes[-1]
+    if a > 0:
+        return (b - a) / a * 100.0
+    return np.nan
+
+
+@njit(cache=True)
+def kline_features(closes_1h, vols_1h, closes_15):
+    """Momentum features for one symbol from float64 close/volume
+    arrays: (chg_15m, chg_1h, chg_4h, chg_24h, vol_accel_1h_vs_6h).
+    Missing windows arrive as empty arrays and come back as NaN."""
+    chg15 = _pct_change(closes_15, 2)
+    chg1h = _pct_change(closes_1h, 2)
+    chg4h = _pct_change(closes_1h, 5)
+    chg24h = _pct_change(closes_1h, 25)
+    va = np.nan
+    if vols_1h.size >= 7:
+        last = vols_1h[-1]
+        prev = np.mean(vols_1h[-7:-1])
+        if last != 0.0 and prev != 0.0:
+            va = (last + 1.0) / (prev + 1.0)
+    return chg15, chg1h, chg4h, chg24h, va
@@ -1,11 +1,39 @@
+import hashlib
+import json
 import os
+import random
+import re
+import threading
 import time
-from functools import lru_cache
+from collections import deque
+from functools import lru_cache, wraps
 from typing import Any, Dict, Optional
+from urllib.parse import urlencode
 
 from dotenv import load_dotenv
+import pandas as pd
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import redis as _redis
+except ImportError:
+    _redis = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads_response(r):
+    """Parse a requests Response body; orjson skips the text-decode pass
+    and is several times faster on the big CoinGecko payloads."""
+    if orjson is not None:
+        return orjson.loads(r.content)
+    return r.json()
 
 # Load .env locally; on Streamlit Cloud use st.secrets
 load_dotenv()
@@ -19,29 +47,195 @@ def get_secret(key: str, default: Optional[str] = None) -> Optional[str]:
         pass
     return os.getenv(key, default)
 
+def ttl_cache(ttl_s: int):
+    """In-process memoizer with expiry; thread-safe for pool workers."""
+    def deco(fn):
+        store: Dict[Any, Any] = {}
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                hit = store.get(key)
+                if hit and hit[1] > time.time():
+                    return hit[0]
+            value = fn(*args, **kwargs)
+            with lock:
+                store[key] = (value, time.time() + ttl_s)
+            return value
+
+        wrapper.cache_clear = store.clear
+        return wrapper
+    return deco
+
+# Per-endpoint TTLs: fast-moving candles expire quickly, big static
+# catalogues (coins/list, exchangeInfo) are good for an hour. Klines
+# must not outlive the 30s freshness get_klines declares upstream.
+_TTL_POLICY = [
+    (re.compile(r"/klines"), 30),
+    (re.compile(r"/coins/list"), 3600),
+    (re.compile(r"/exchangeInfo"), 3600),
+    (re.compile(r"."), 60),
+]
+
+def _ttl_for(url: str) -> int:
+    for pat, ttl in _TTL_POLICY:
+        if pat.search(url):
+            return ttl
+    return 60
+
+class ResponseCache:
+    """Redis-backed response cache; falls back to an in-process dict
+    when Redis is unavailable. Keeps a long-lived ":stale" copy so a
+    flaky upstream can serve the last known-good payload."""
+
+    STALE_TTL = 24 * 3600
+
+    def __init__(self):
+        self._mem: Dict[str, Any] = {}
+        self._r = None
+        if _redis is not None:
+            try:
+                self._r = _redis.Redis.from_url(
+                    get_secret("REDIS_URL", "redis://localhost:6379/0"),
+                    socket_connect_timeout=1,
+                )
+                self._r.ping()
+            except Exception:
+                self._r = None
+
+    def get(self, key: str):
+        if self._r is not None:
+            try:
+                raw = self._r.get(key)
+                return json.loads(raw) if raw is not None else None
+            except Exception:
+                pass
+        hit = self._mem.get(key)
+        if hit and hit[1] > time.time():
+            return hit[0]
+        return None
+
+    def set(self, key: str, value, ttl: int):
+        payload = json.dumps(value)
+        if self._r is not None:
+            try:
+                self._r.setex(key, ttl, payload)
+                self._r.setex(key + ":stale", self.STALE_TTL, payload)
+                return
+            except Exception:
+                pass
+        self._mem[key] = (value, time.time() + ttl)
+        self._mem[key + ":stale"] = (value, time.time() + self.STALE_TTL)
+
+    def get_stale(self, key: str):
+        return self.get(key + ":stale")
+
+# Recent 429/418 timestamps across all clients; when upstreams are
+# throttling us, back off preemptively instead of piling on.
+_RATE_LIMIT_HITS = deque(maxlen=64)
+
+def _throttle_if_hot(threshold: int = 5, window: float = 60.0, pause: float = 2.0):
+    now = time.time()
+    if sum(1 for t in _RATE_LIMIT_HITS if now - t < window) >= threshold:
+        time.sleep(pause)
+
 class HttpClient:
     def __init__(self, user_agent: str = "smart-alpha/1.0"):
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": user_agent})
+        # Default pools hold 10 connections; with 16+ pool workers the
+        # extras pay a fresh TCP+TLS handshake per request. Size the
+        # pools for the thread fan-out and retry transient server
+        # errors at the adapter level. Rate-limit statuses (429/418)
+        # stay out of the forcelist: jget handles those itself so the
+        # Retry-After cap and the shared pressure valve apply.
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET"],
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.cache = ResponseCache()
+        self._etags: Dict[str, str] = {}
+        self._etag_bodies: Dict[str, Any] = {}
+
+    @staticmethod
+    def _cache_key(url: str, params: Dict[str, Any] = None) -> str:
+        qs = urlencode(sorted((params or {}).items()))
+        return "jget:" + hashlib.sha1((url + qs).encode()).hexdigest()
 
     def jget(self, url: str, params: Dict[str, Any] = None, retries: int = 3, timeout: int = 20, headers: Dict[str, str] = None):
+        key = self._cache_key(url, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
         last_err = None
         for i in range(retries):
             try:
+                _throttle_if_hot()
                 h = dict(headers or {})
                 r = self.session.get(url, params=params, timeout=timeout, headers=h)
                 if r.status_code in (429, 418, 520, 525):
-                    time.sleep(1 + i)
+                    if r.status_code in (429, 418):
+                        _RATE_LIMIT_HITS.append(time.time())
+                    # Honor Retry-After when the server names a wait;
+                    # otherwise exponential backoff with jitter.
+                    ra = r.headers.get("Retry-After")
+                    try:
+                        wait = min(float(ra), 60.0) if ra else None
+                    except ValueError:
+                        wait = None
+                    if wait is None:
+                        wait = min(2 ** i + random.random(), 60.0)
+                    time.sleep(wait)
                     continue
                 r.raise_for_status()
-                return r.json()
+                data = _loads_response(r)
+                self.cache.set(key, data, _ttl_for(url))
+                return data
             except Exception as e:
                 last_err = e
-                time.sleep(0.5 * (i + 1))
+                time.sleep(0.5 * (i + 1) + random.random() * 0.5)
+        stale = self.cache.get_stale(key)
+        if stale is not None:
+            return stale
         raise last_err or RuntimeError("HTTP GET failed")
 
+    def jget_conditional(self, url: str, params: Dict[str, Any] = None, timeout: int = 20, headers: Dict[str, str] = None):
+        """GET with ETag revalidation. A 304 reuses the cached body —
+        GitHub doesn't count 304s against the rate limit."""
+        key = self._cache_key(url, params)
+        h = dict(headers or {})
+        etag = self._etags.get(key)
+        if etag:
+            h["If-None-Match"] = etag
+        r = self.session.get(url, params=params, timeout=timeout, headers=h)
+        if r.status_code == 304 and key in self._etag_bodies:
+            return self._etag_bodies[key]
+        r.raise_for_status()
+        body = _loads_response(r)
+        if r.headers.get("ETag"):
+            self._etags[key] = r.headers["ETag"]
+            self._etag_bodies[key] = body
+        return body
+
 http = HttpClient()
 
+@st.cache_resource(show_spinner=False)
+def get_http() -> HttpClient:
+    """The process-wide HttpClient; cache_resource keeps one pooled
+    session shared across Streamlit sessions instead of per-rerun
+    connections."""
+    return http
+
 def fmt_usd(x):
     try:
         x = float(x)
@@ -64,6 +258,17 @@ def safe_float(x, default=None):
     except Exception:
         return default
 
+def coerce_numeric(df, cols, default=0.0):
+    """Cast DataFrame columns to float32 in one C-level pass, replacing
+    unparseable values with `default`. Use this instead of mapping
+    safe_float over cells — one cast per column, no per-value try/except."""
+    present = [c for c in cols if c in df.columns]
+    if present:
+        df[present] = (
+            df[present].apply(pd.to_numeric, errors="coerce").fillna(default).astype("float32")
+        )
+    return df
+
 def st_theme_mode():
     mode = st.session_state.get("theme_mode", "Dark")
     return mode
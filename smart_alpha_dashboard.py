@@ -1,17 +1,29 @@
 import io
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from datetime import datetime, UTC
-from core.utils import fmt_usd, fmt_pct, st_theme_toggle, safe_float
+from core.utils import st_theme_toggle
 from core import data_sources as ds
 from core import scoring as sc
+from core.scoring_kernels import kline_features
+from core.prewarm import start_prewarm
 import traceback, requests
 
+try:
+    from streamlit_autorefresh import st_autorefresh
+except ImportError:
+    st_autorefresh = None
+
 # ---- PAGE CONFIG ----
 st.set_page_config(page_title="Smart Alpha Dashboard", layout="wide")
 
+# Warm the catalogue caches off the critical path (no-op after first call)
+start_prewarm()
+
 st.title("🧠 Smart Alpha Dashboard (Binance Alpha)")
 st.caption("Combines Binance Alpha-only tokens with fundamentals, unlock schedules, TVL/dev activity, and market momentum.")
 
@@ -23,6 +35,20 @@ with st.sidebar:
     refresh_sec = st.slider("Refresh every (seconds)", 30, 300, 90, 10)
     min_qvol = st.number_input("Min 24h Quote Volume (USDT)", value=5_000_000.0, step=500_000.0, format="%.0f")
     topn = st.slider("Show Top N", 10, 100, 30, 5)
+    debug = st.checkbox("Debug mode", False)
+
+# ---- AUTO-REFRESH ----
+# One rerun per refresh window: the ts query param is bucketed to the
+# slider interval and only written when the bucket rolls over, so
+# widget interactions never thrash the fetch pipeline.
+if auto:
+    bucket = str(int(datetime.now(UTC).timestamp() // refresh_sec))
+    if st.query_params.get("ts") != bucket:
+        st.query_params["ts"] = bucket
+    if st_autorefresh is not None:
+        st_autorefresh(interval=refresh_sec * 1000, key="auto_refresh")
+    else:
+        st.sidebar.caption("Install `streamlit-autorefresh` to enable auto-refresh.")
 
 # ---- TIMESTAMP DISPLAY (not mutation) ----
 st.markdown(f"⏱️ Last refresh: `{datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')}`")
@@ -41,7 +67,8 @@ with st.spinner("Fetching 24h ticker data (diagnostic)..."):
         if stats is None:
             st.error("⚠️ get_ticker_24h_all() returned None.")
             st.stop()
-        st.write(f"✅ Fetched ticker data: {len(stats)} rows")
+        if debug:
+            st.write(f"✅ Fetched ticker data: {len(stats)} rows")
     except requests.exceptions.RequestException as e:
         st.error(f"❌ Network error: {e}")
         st.stop()
@@ -50,119 +77,185 @@ with st.spinner("Fetching 24h ticker data (diagnostic)..."):
         st.code(traceback.format_exc())
         st.stop()
 
-rows = []
-for _, r in alpha_map.iterrows():
-    sym = r["spot_symbol"]
-    base = r["symbol"]
-    strow = stats[stats["symbol"] == sym]
-    if strow.empty:
-        continue
+# Keep only tickers that can match an Alpha pair — set-backed isin cuts
+# the ~1000-row frame to watchlist size before anything else touches it.
+stats = stats[stats["symbol"].isin(set(alpha_map["spot_symbol"]))].copy()
 
-    qvol = float(strow["quoteVolume"].iloc[0])
-    if qvol < min_qvol:
-        continue
+# ---- VECTORIZED ASSEMBLY ----
+# One hashed join replaces the per-symbol boolean-mask scans; the
+# volume filter runs as a single mask before any enrichment I/O.
+base_df = alpha_map.merge(
+    stats[["symbol", "lastPrice", "quoteVolume"]],
+    left_on="spot_symbol", right_on="symbol",
+    how="inner", suffixes=("", "_pair"),
+)
+base_df["quoteVolume"] = pd.to_numeric(base_df["quoteVolume"], errors="coerce")
+base_df["lastPrice"] = pd.to_numeric(base_df["lastPrice"], errors="coerce")
+base_df = base_df[base_df["quoteVolume"] >= min_qvol].reset_index(drop=True)
 
-    price = float(strow["lastPrice"].iloc[0])
+if base_df.empty:
+    st.warning("No Alpha tokens met your filters right now.")
+    st.stop()
 
-    # --- Price momentum
-    try:
-        kl1h = ds.get_klines(sym, "1h", 60)
-        kl15 = ds.get_klines(sym, "15m", 48)
-    except Exception:
-        kl1h, kl15 = None, None
-
-    def pct_from(kl, n):
-        if not kl or len(kl) < 2:
-            return None
-        sub = kl[-n:] if len(kl) >= n else kl
-        a = float(sub[0][4])
-        b = float(sub[-1][4])
-        return (b - a) / a * 100.0 if a > 0 else None
-
-    chg_15m = pct_from(kl15, 2)
-    chg_1h = pct_from(kl1h, 2)
-    chg_4h = pct_from(kl1h, 5)
-    chg_24h = pct_from(kl1h, 25)
-
-    vol_last_1h = float(kl1h[-1][5]) if kl1h else None
-    vol_prev_6h = (
-        sum(float(x[5]) for x in (kl1h[-7:-1] if kl1h and len(kl1h) >= 7 else [])) / 6 if kl1h else None
-    )
-    vol_accel = (vol_last_1h + 1) / (vol_prev_6h + 1) if (vol_last_1h and vol_prev_6h) else None
-
-    # --- Fundamentals
-    cg_id = ds.cg_find_id_by_symbol_platform(base, None)
-    mcap = fdv = circ_ratio = None
-    gh_commits = gh_contribs = None
-    if cg_id:
+# --- Fundamentals: resolve IDs once, one batched /coins/markets call
+base_df["cg_id"] = base_df["symbol"].astype(str).map(ds.cg_find_id_by_symbol_platform)
+mkts = ds.cg_markets_batch(base_df["cg_id"].dropna().unique().tolist())
+if not mkts.empty:
+    mkts = mkts.drop_duplicates(subset="id").set_index("id")
+    base_df["market_cap_usd"] = base_df["cg_id"].map(mkts["market_cap"])
+    base_df["fdv_usd"] = base_df["cg_id"].map(mkts["fully_diluted_valuation"])
+    circ = base_df["cg_id"].map(mkts["circulating_supply"])
+    total = base_df["cg_id"].map(mkts["total_supply"])
+    base_df["circ_ratio"] = (circ / total).where(total > 0)
+else:
+    base_df["market_cap_usd"] = base_df["fdv_usd"] = base_df["circ_ratio"] = None
+
+
+# --- Per-symbol enrichment (klines, unlocks, GitHub) into dicts keyed
+# by spot symbol, assigned as whole columns afterwards. All network
+# calls go through one thread pool so ~30 symbols cost a few round
+# trips of wall time instead of a few round trips each.
+# Struct-of-arrays: one list per output column, appended in base_df row
+# order, so assembly is a direct column assignment with no dict probing.
+ENRICH_COLS = (
+    "chg_15m_pct", "chg_1h_pct", "chg_4h_pct", "chg_24h_pct", "vol_accel_1h_vs_6h",
+    "next_unlock_days", "next_unlock_pct", "next_unlock_usd",
+    "github_commits_30d", "github_contributors",
+)
+cols = {name: [] for name in ENRICH_COLS}
+EMPTY_F64 = np.empty(0, dtype=np.float64)  # "no data" input for the feature kernel
+kl15_full = {}  # full 15m window per symbol, reused by the mini charts
+
+triples = list(zip(base_df["spot_symbol"], base_df["symbol"], base_df["cg_id"]))
+with ThreadPoolExecutor(max_workers=16) as ex:
+    # Every kline window rides one asyncio event loop (run in a pool
+    # worker) while the remaining per-token REST calls use the pool —
+    # fetch latency collapses to roughly the slowest request.
+    # 96 candles on 15m cover both needs: last 48 for scoring, full
+    # window for the mini charts later — one fetch instead of two.
+    kl_specs = [(sym, "1h", 60) for sym, _, _ in triples] + \
+               [(sym, "15m", 96) for sym, _, _ in triples]
+    fkl = ex.submit(ds.get_klines_batch, kl_specs)
+    fcg = {sym: ex.submit(ds.cg_coin_market_data, cg_id)
+           for sym, _, cg_id in triples if cg_id and not pd.isna(cg_id)}
+    fun = {sym: ex.submit(ds.unlocks_lookup, base) for sym, base, _ in triples}
+
+    # Second wave: GitHub stats need the repo link from the coin payload
+    fgh = {}
+    for sym, f in fcg.items():
         try:
-            md = ds.cg_coin_market_data(cg_id)
-            mkt = md.get("market_data", {})
-            mcap = safe_float(mkt.get("market_cap", {}).get("usd"))
-            fdv = safe_float(mkt.get("fully_diluted_valuation", {}).get("usd"))
-            circ = safe_float(mkt.get("circulating_supply"))
-            total = safe_float(mkt.get("total_supply"))
-            circ_ratio = (circ / total) if (circ and total and total > 0) else None
-
-            links = md.get("links", {})
-            gh = (links.get("repos_url") or {}).get("github") or []
+            md = f.result()
+            gh = ((md.get("links") or {}).get("repos_url") or {}).get("github") or []
             if gh:
-                gh_stats = ds.github_repo_stats(gh[0])
-                gh_commits = gh_stats.get("github_commits_approx")
-                gh_contribs = gh_stats.get("github_contributors")
+                fgh[sym] = ex.submit(ds.github_repo_stats, gh[0])
         except Exception:
             pass
 
-    # --- Unlock data
-    next_unlock_days = next_unlock_pct = next_unlock_usd = None
-    try:
-        un = ds.unlocks_lookup(base)
-        pu = ds.parse_next_unlock(un or {})
-        if pu.get("next_date"):
-            dt = pd.to_datetime(pu["next_date"], utc=True)
-            days = (dt - pd.Timestamp.now(tz=UTC)).total_seconds() / 86400.0
-            next_unlock_days = days
-        next_unlock_pct = pu.get("next_pct")
-        next_unlock_usd = pu.get("next_usd")
-    except Exception:
-        pass
+    # Sequential pass is pure CPU now: futures are resolved, not awaited one-by-one
+    klines = fkl.result()
+    for sym, base, _ in triples:
+        kl1h = klines.get((sym, "1h"))
+        kl15 = klines.get((sym, "15m"))
+        if kl15:
+            kl15_full[sym] = kl15
+            kl15 = kl15[-48:]
 
-    # --- Scoring
-    mom = sc.momentum_score(chg_15m, chg_1h, chg_4h, chg_24h, vol_accel)
-    fund = sc.fundamental_score(mcap, fdv, circ_ratio)
-    unl = sc.unlock_risk_score(next_unlock_days, next_unlock_pct)
-    use = sc.usage_dev_score(None, None, gh_commits, gh_contribs)
-    smart = sc.smart_alpha_score(dict(momentum=mom, fundamentals=fund, unlock=unl, usage=use))
-
-    rows.append(dict(
-        symbol=sym, base=base, price_usd=price, quoteVolume_24h=qvol,
-        chg_15m_pct=chg_15m, chg_1h_pct=chg_1h, chg_4h_pct=chg_4h, chg_24h_pct=chg_24h,
-        vol_accel_1h_vs_6h=vol_accel,
-        market_cap_usd=mcap, fdv_usd=fdv, circ_ratio=circ_ratio,
-        next_unlock_days=next_unlock_days, next_unlock_pct=next_unlock_pct, next_unlock_usd=next_unlock_usd,
-        github_commits_30d=gh_commits, github_contributors=gh_contribs,
-        alpha_score=smart,
-        alphaId=r.get("alphaId"), chainId=r.get("chainId"), contractAddress=r.get("contractAddress")
-    ))
-
-df = pd.DataFrame(rows)
-if df.empty:
-    st.warning("No Alpha tokens met your filters right now.")
-    st.stop()
+        # One float cast per kline batch, then the whole momentum block
+        # runs in a single (numba-compiled when available) kernel.
+        # Missing windows pass as empty arrays and come back as NaN.
+        arr1h = np.asarray(kl1h, dtype=float) if kl1h else None
+        closes_1h = arr1h[:, 4] if arr1h is not None else EMPTY_F64
+        vols_1h = arr1h[:, 5] if arr1h is not None else EMPTY_F64
+        closes_15 = np.asarray(kl15, dtype=float)[:, 4] if kl15 else EMPTY_F64
+
+        chg15, chg1h, chg4h, chg24h, vol_accel = kline_features(
+            closes_1h, vols_1h, closes_15
+        )
+        cols["chg_15m_pct"].append(chg15)
+        cols["chg_1h_pct"].append(chg1h)
+        cols["chg_4h_pct"].append(chg4h)
+        cols["chg_24h_pct"].append(chg24h)
+        cols["vol_accel_1h_vs_6h"].append(vol_accel)
+
+        gh_stats = {}
+        if sym in fgh:
+            try:
+                gh_stats = fgh[sym].result() or {}
+            except Exception:
+                gh_stats = {}
+        cols["github_commits_30d"].append(gh_stats.get("github_commits_approx"))
+        cols["github_contributors"].append(gh_stats.get("github_contributors"))
+
+        # --- Unlock data
+        unlock_days = unlock_pct = unlock_usd = None
+        try:
+            un = fun[sym].result()
+            pu = ds.parse_next_unlock(un or {})
+            if pu.get("next_date"):
+                dt = pd.to_datetime(pu["next_date"], utc=True)
+                unlock_days = (dt - pd.Timestamp.now(tz=UTC)).total_seconds() / 86400.0
+            unlock_pct = pu.get("next_pct")
+            unlock_usd = pu.get("next_usd")
+        except Exception:
+            pass
+        cols["next_unlock_days"].append(unlock_days)
+        cols["next_unlock_pct"].append(unlock_pct)
+        cols["next_unlock_usd"].append(unlock_usd)
+
+# --- Assemble display frame: each enrichment list lands as one column,
+# already aligned with base_df row order.
+df = base_df.rename(columns={"lastPrice": "price_usd", "quoteVolume": "quoteVolume_24h"})
+df["base"] = df["symbol"]
+df["symbol"] = df["spot_symbol"]
+for name in ENRICH_COLS:
+    df[name] = cols[name]
+
+# --- Scoring: one vectorized pass over the whole frame
+df["alpha_score"] = sc.smart_alpha_score_vec(df)
+
+SHOW_COLS = [
+    "symbol", "base", "price_usd", "quoteVolume_24h",
+    "chg_15m_pct", "chg_1h_pct", "chg_4h_pct", "chg_24h_pct",
+    "vol_accel_1h_vs_6h",
+    "market_cap_usd", "fdv_usd", "circ_ratio",
+    "next_unlock_days", "next_unlock_pct", "next_unlock_usd",
+    "github_commits_30d", "github_contributors",
+    "alpha_score", "alphaId", "chainId", "contractAddress",
+]
+df = df[[c for c in SHOW_COLS if c in df.columns]]
+
+# Compact dtypes: float32 is plenty for display-precision fields and
+# halves the serialization cost; counts become nullable Int32. Market
+# cap / FDV / unlock USD stay float64 — above 2^24 float32 drops digits.
+COMPACT_DTYPES = {
+    "price_usd": "float32", "quoteVolume_24h": "float32",
+    "chg_15m_pct": "float32", "chg_1h_pct": "float32",
+    "chg_4h_pct": "float32", "chg_24h_pct": "float32",
+    "vol_accel_1h_vs_6h": "float32", "circ_ratio": "float32",
+    "market_cap_usd": "float64", "fdv_usd": "float64",
+    "next_unlock_days": "float32", "next_unlock_pct": "float32",
+    "next_unlock_usd": "float64",
+    "github_commits_30d": "Int32", "github_contributors": "Int32",
+    "alpha_score": "float32",
+}
+df = df.astype({c: t for c, t in COMPACT_DTYPES.items() if c in df.columns})
 
 df = df.sort_values("alpha_score", ascending=False)
+top = df.head(topn)  # sliced once, reused by every display section
 
 # ---- DISPLAY ----
 st.subheader("Top Smart Alpha Picks")
-st.dataframe(df.head(topn), use_container_width=True, hide_index=True)
+st.dataframe(top, use_container_width=True, hide_index=True)
 
 if not df.empty:
     st.markdown("### Smart Alpha Score Heatmap")
-    heat = px.bar(df.head(topn), x="symbol", y="alpha_score", color="alpha_score", color_continuous_scale="Viridis")
-    st.plotly_chart(heat, use_container_width=True)
+    heat = px.bar(top, x="symbol", y="alpha_score", color="alpha_score", color_continuous_scale="Viridis")
+    # Static render: no hover-event DOM work for up to 100 bars
+    st.plotly_chart(heat, use_container_width=True,
+                    config={"staticPlot": True, "displayModeBar": False})
 
     st.markdown("### Market Cap vs 24h Volume")
-    scat = px.scatter(df.head(topn),
+    scat = px.scatter(top,
                       x="market_cap_usd", y="quoteVolume_24h",
                       size="alpha_score", hover_name="symbol",
                       labels={"market_cap_usd": "Market Cap (USD)", "quoteVolume_24h": "24h Quote Volume (USD)"})
@@ -171,33 +264,56 @@ if not df.empty:
 # ---- MINI CHARTS ----
 st.markdown("### Mini Price Charts (15m close)")
 cols = st.columns(3)
-for i, sym in enumerate(df["symbol"].head(6).tolist()):
+for i, sym in enumerate(top["symbol"].head(6).tolist()):
     with cols[i % 3]:
         try:
-            kl = ds.get_klines(sym, "15m", 96)
-            t = [pd.to_datetime(x[0], unit="ms") for x in kl]
-            c = [float(x[4]) for x in kl]
+            kl = kl15_full.get(sym) or ds.get_klines(sym, "15m", 96)
+            # One vectorized parse per chart instead of 96 Timestamp objects
+            arr = np.asarray(kl, dtype=object)
+            t = pd.to_datetime(arr[:, 0].astype("int64"), unit="ms")
+            c = arr[:, 4].astype(float)
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=t, y=c, mode="lines", name=sym))
+            # Scattergl renders thumbnails on WebGL instead of SVG DOM nodes
+            fig.add_trace(go.Scattergl(x=t, y=c, mode="lines", name=sym))
             fig.update_layout(title=sym, height=300, margin=dict(l=40, r=20, t=40, b=40))
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True,
+                            config={"staticPlot": True, "displayModeBar": False})
         except Exception:
             st.write(f"{sym}: chart unavailable")
 
 # ---- EXPORT ----
 st.markdown("### Export Data")
-csv = df.to_csv(index=False).encode("utf-8")
+try:
+    # Arrow's C++ writer emits UTF-8 bytes directly; pandas' pure-Python
+    # CSV writer stays as the fallback.
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    buf = io.BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    csv = buf.getvalue()
+except Exception:
+    csv = df.to_csv(index=False).encode("utf-8")
 st.download_button("Download CSV", data=csv, file_name="smart_alpha_scan.csv", mime="text/csv")
 
+excel_engine = None
 try:
-    import openpyxl
+    import xlsxwriter  # noqa: F401  (2-5x faster than openpyxl)
+    excel_engine = "xlsxwriter"
+except ImportError:
+    try:
+        import openpyxl  # noqa: F401
+        excel_engine = "openpyxl"
+    except ImportError:
+        pass
+
+if excel_engine:
     out = io.BytesIO()
-    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+    with pd.ExcelWriter(out, engine=excel_engine) as writer:
         df.to_excel(writer, index=False, sheet_name="SmartAlpha")
     st.download_button("Download Excel", data=out.getvalue(),
                        file_name="smart_alpha_scan.xlsx",
                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-except Exception:
-    st.caption("Install `openpyxl` for Excel export.")
+else:
+    st.caption("Install `xlsxwriter` (or `openpyxl`) for Excel export.")
 
 st.success(f"✅ Dashboard rendered successfully at {datetime.now(UTC).strftime('%H:%M:%S UTC')}")